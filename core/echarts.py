@@ -0,0 +1,45 @@
+import json
+from typing import Dict, Any, Iterable
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+
+def script_json_dumps(obj: Any) -> bytes:
+    """序列化为可直接嵌入<script>的JSON，转义 "</" 防止函数名提前闭合脚本标签"""
+    return _json_dumps(obj).replace(b'</', b'<\\/')
+
+def echarts_node(node_id: str, name: str, call_count: int) -> Dict[str, Any]:
+    """调用图节点对应的ECharts节点，节点大小随调用次数增长，封顶为30"""
+    return {
+        'id': node_id,
+        'name': name,
+        'symbolSize': 10 + call_count if call_count < 20 else 30,
+        'value': call_count,
+        'category': 0
+    }
+
+def echarts_link(source: str, target: str, call_count: int) -> Dict[str, Any]:
+    """调用图边对应的ECharts边，边宽度随调用次数增长，封顶为5"""
+    return {
+        'source': source,
+        'target': target,
+        'value': call_count,
+        'lineStyle': {
+            'width': 1 + call_count / 10 if call_count < 40 else 5
+        }
+    }
+
+def write_script_array(f, items: Iterable[Dict[str, Any]]) -> None:
+    """将对象逐个序列化为可嵌入<script>的紧凑JSON数组写入文件"""
+    f.write(b'[')
+    first = True
+    for item in items:
+        if not first:
+            f.write(b',')
+        f.write(script_json_dumps(item))
+        first = False
+    f.write(b']')
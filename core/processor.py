@@ -1,25 +1,50 @@
 import json
 import logging
 import re
-from typing import Dict, List, Set, Optional, Any, Tuple
-from dataclasses import dataclass
+import struct
+import sys
+from array import array
+from collections import Counter
+from itertools import accumulate, chain
+from typing import Dict, List, Set, Optional, Any, Tuple, Iterable
 from pathlib import Path
 import networkx as nx
 from datetime import datetime
 
-@dataclass
-class FunctionNode:
-    name: str
-    call_count: int = 0
+from core.echarts import echarts_node, echarts_link, write_script_array
 
-@dataclass
-class FunctionEdge:
-    source: str
-    target: str
-    call_count: int = 0
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    _json_loads = json.loads
+
+try:
+    import igraph
+except ImportError:  # igraph 为可选的图后端
+    igraph = None
+
+# 支持的图后端
+GRAPH_BACKENDS = ('networkx', 'igraph')
+
+# 堆栈解析正则表达式：每行一个栈帧，锚定行首且各部分都不跨行，避免回溯
+_STACK_PATTERN = re.compile(r'^[ \t]*at[ \t]+([^(\s]+)\(([^)\n]+)\)', re.MULTILINE)
+
+# 二进制格式文件头：魔数、节点数、边数、元数据长度、字符串表长度（小端）
+_BINARY_MAGIC = b'CGB1'
+_BINARY_HEADER = struct.Struct('<4sIIII')
 
 class CallGraphProcessor:
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, backend: str = 'networkx'):
+        if backend not in GRAPH_BACKENDS:
+            raise ValueError(f"Unsupported graph backend: {backend}")
+        if backend == 'igraph' and igraph is None:
+            raise ImportError("The igraph backend requires python-igraph: pip install igraph")
+        self.backend = backend
+        
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -31,17 +56,18 @@ class CallGraphProcessor:
         self.logger = logging.getLogger('CallGraphProcessor')
         
         # 初始化图
-        self.graph = nx.DiGraph()
-        self.nodes: Dict[str, FunctionNode] = {}
-        self.edges: Dict[tuple, FunctionEdge] = {}
+        self.graph = nx.DiGraph() if backend == 'networkx' else igraph.Graph(directed=True)
+        # 函数及调用关系的调用次数
+        self.node_counts: Counter = Counter()
+        self.edge_counts: Counter = Counter()
         
         # 统计数据
         self.total_calls = 0
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
-
-        # 堆栈解析正则表达式
-        self.stack_pattern = re.compile(r'at\s+([^(]+)\(([^)]+)\)')
+        # 数据版本号，每次写入完成后递增；get_statistics 的缓存记录计算时的版本号，版本不一致即失效
+        self._version = 0
+        self._stats_cache: Optional[Tuple[int, Dict[str, Any]]] = None
 
     def parse_stack_trace(self, stack_trace: str) -> List[Tuple[str, str]]:
         """解析堆栈信息，提取调用关系
@@ -52,31 +78,41 @@ class CallGraphProcessor:
         Returns:
             调用关系列表，每个元素为 (调用者, 被调用者) 的元组
         """
-        calls = []
-        lines = re.split(r'\n\t?',stack_trace)
+        # 一次性提取所有栈帧，相邻两帧构成 (调用者, 被调用者)
+        # 函数名统一驻留，重复出现的同名函数共享同一个字符串对象
+        frames = [sys.intern(name) for name, _ in _STACK_PATTERN.findall(stack_trace)]
+        calls = [(frames[i + 1], frames[i]) for i in range(len(frames) - 1)]
         
-        # 跳过第一行（当前方法）
-        for i in range(1, len(lines)-1):
-            current_line = lines[i].strip()
-            next_line = lines[i+1].strip() if i+1 < len(lines) else None
-            
-            if not current_line or not next_line:
-                continue
-                
-            current_match = self.stack_pattern.search(current_line)
-            next_match = self.stack_pattern.search(next_line)
+        return calls
+
+    def parse_stack_traces(self, traces: List[str]) -> List[List[Tuple[str, str]]]:
+        """批量解析多段堆栈信息
+        
+        将所有堆栈拼接后只做一次正则扫描，再按各段的边界把栈帧分回对应的堆栈。
+        
+        Args:
+            traces: 堆栈文本列表
             
-            if current_match and next_match:
-                caller = next_match.group(1).strip()
-                # caller_module = next_match.group(2).strip()
-                callee = current_match.group(1).strip()
-                # callee_module = current_match.group(2).strip()
-                
-                # 过滤掉系统类
-                # if not any(x in caller_module for x in ['java.', 'android.', 'kotlin.']):
-                calls.append((caller, callee))
+        Returns:
+            与 traces 一一对应的调用关系列表
+        """
+        # 以换行拼接，使每段堆栈的首行同样满足行首锚定
+        blob = '\n'.join(traces)
+        # 每段堆栈（含分隔符）在拼接文本中的结束位置
+        boundaries = list(accumulate(len(trace) + 1 for trace in traces))
+        frames_per_trace: List[List[str]] = [[] for _ in traces]
         
-        return calls
+        index = 0
+        for match in _STACK_PATTERN.finditer(blob):
+            position = match.start(1)
+            while position >= boundaries[index]:
+                index += 1
+            frames_per_trace[index].append(sys.intern(match.group(1)))
+        
+        return [
+            [(frames[i + 1], frames[i]) for i in range(len(frames) - 1)]
+            for frames in frames_per_trace
+        ]
 
     def process_stack_trace(self, record: Dict[str, Any]) -> None:
         """处理堆栈信息记录
@@ -84,49 +120,76 @@ class CallGraphProcessor:
         Args:
             record: 包含堆栈信息的记录
         """
-        if not self.start_time:
-            self.start_time = datetime.fromisoformat(record['timestamp'].replace('Z', '+00:00'))
-        
-        self.end_time = datetime.fromisoformat(record['timestamp'].replace('Z', '+00:00'))
-        
-        if 'data' not in record or 'stackTrace' not in record['data']:
+        try:
+            stack_trace = self._record_stack_trace(record)
+        except ValueError as e:
+            self.logger.warning(f"Skipping invalid record: {e}")
             return
-            
-        stack_trace = record['data']['stackTrace']
-        calls = self.parse_stack_trace(stack_trace)
         
-        for caller, callee in calls:
-            self.total_calls += 1
-            
-            # 处理调用者节点
-            if caller not in self.nodes:
-                self.nodes[caller] = FunctionNode(
-                    name=caller,
-                )
-            self.nodes[caller].call_count += 1
+        record_time = self._record_time(record)
+        if self.start_time is None:
+            self.start_time = record_time
+        self.end_time = record_time
+        
+        # 不含堆栈的记录只更新时间范围
+        if stack_trace is not None:
+            self._add_calls(self.parse_stack_trace(stack_trace))
+        self._version += 1
 
-            # 处理被调用者节点
-            if callee not in self.nodes:
-                self.nodes[callee] = FunctionNode(
-                    name=callee,
-                )
-            self.nodes[callee].call_count += 1
+    @staticmethod
+    def _record_stack_trace(record: Dict[str, Any]) -> Optional[str]:
+        """取出堆栈记录中的堆栈文本，不含堆栈时返回 None，格式错误时抛出 ValueError"""
+        data = record.get('data')
+        if data is None:
+            return None
+        if not isinstance(data, dict):
+            raise ValueError(f"data must be an object, got {type(data).__name__}")
+        stack_trace = data.get('stackTrace')
+        if stack_trace is not None and not isinstance(stack_trace, str):
+            raise ValueError(f"stackTrace must be a string, got {type(stack_trace).__name__}")
+        return stack_trace
 
-            # 处理边（调用关系）
-            edge_key = (caller, callee)
-            if edge_key not in self.edges:
-                self.edges[edge_key] = FunctionEdge(
-                    source=caller,
-                    target=callee
-                )
-            self.edges[edge_key].call_count += 1
+    @staticmethod
+    def _record_call(record: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """取出调用记录中的 (调用者, 被调用者)，缺少字段时返回 None，格式错误时抛出 ValueError"""
+        data = record.get('data')
+        if not data:
+            return None
+        if not isinstance(data, dict):
+            raise ValueError(f"data must be an object, got {type(data).__name__}")
+        caller = data.get('caller')
+        callee = data.get('callee')
+        if not (caller and callee):
+            return None
+        if not (isinstance(caller, str) and isinstance(callee, str)):
+            raise ValueError(f"caller and callee must be strings, got {caller!r} -> {callee!r}")
+        # 函数名统一驻留，重复出现的同名函数共享同一个字符串对象
+        return sys.intern(caller), sys.intern(callee)
 
-            # 更新图
-            self.graph.add_edge(
-                caller,
-                callee,
-                call_count=self.edges[edge_key].call_count
-            )
+    @staticmethod
+    def _record_time(record: Dict[str, Any]) -> datetime:
+        """解析记录的时间戳（ISO字符串或毫秒时间戳）"""
+        timestamp = record['timestamp']
+        if isinstance(timestamp, str):
+            if timestamp.endswith('Z'):
+                timestamp = timestamp[:-1] + '+00:00'
+            return datetime.fromisoformat(timestamp)
+        return datetime.fromtimestamp(timestamp / 1000)
+
+    def _add_calls(self, calls: List[Tuple[str, str]]) -> None:
+        """批量记录调用，计数更新在 Counter.update 的C实现中完成"""
+        self.total_calls += len(calls)
+        self.node_counts.update(chain.from_iterable(calls))
+        self.edge_counts.update(calls)
+
+    def _add_call(self, caller: str, callee: str) -> None:
+        """记录一次调用"""
+        self.total_calls += 1
+        self.node_counts[caller] += 1
+        self.node_counts[callee] += 1
+
+        # 处理边（调用关系）
+        self.edge_counts[(caller, callee)] += 1
 
     def process_call_record(self, record: Dict[str, Any]) -> None:
         """处理调用记录
@@ -138,63 +201,124 @@ class CallGraphProcessor:
             self.process_stack_trace(record)
         else:
             # 处理其他类型的记录
-            if 'data' in record and all(k in record['data'] for k in ['caller', 'callee']):
-                data = record['data']
-                if not self.start_time:
-                    self.start_time = datetime.fromtimestamp(record['timestamp'] / 1000)
-                
-                self.end_time = datetime.fromtimestamp(record['timestamp'] / 1000)
-                self.total_calls += 1
-
-                # 处理调用者节点
-                caller_id = data['caller']
-                if caller_id not in self.nodes:
-                    self.nodes[caller_id] = FunctionNode(
-                        name=data['caller'],
-                    )
-                self.nodes[caller_id].call_count += 1
-
-                # 处理被调用者节点
-                callee_id = data['callee']
-                if callee_id not in self.nodes:
-                    self.nodes[callee_id] = FunctionNode(
-                        name=data['callee'],
-                    )
-                self.nodes[callee_id].call_count += 1
+            try:
+                call = self._record_call(record)
+            except ValueError as e:
+                self.logger.warning(f"Skipping invalid record: {e}")
+                return
+            if call is None:
+                return
+            caller, callee = call
 
-                # 处理边（调用关系）
-                edge_key = (caller_id, callee_id)
-                if edge_key not in self.edges:
-                    self.edges[edge_key] = FunctionEdge(
-                        source=caller_id,
-                        target=callee_id
-                    )
-                self.edges[edge_key].call_count += 1
+            record_time = self._record_time(record)
+            if self.start_time is None:
+                self.start_time = record_time
+            self.end_time = record_time
+            self._add_call(caller, callee)
+            self._version += 1
 
-                # 更新图
-                self.graph.add_edge(
-                    caller_id,
-                    callee_id,
-                    call_count=self.edges[edge_key].call_count
-                )
+    def process_many(self, records: List[Dict[str, Any]]) -> None:
+        """批量处理调用记录
+        
+        先收集整批记录的调用关系，再一次性更新计数。
+        格式错误或时间戳无效的记录会被跳过，不影响同批其他记录。
+        
+        Args:
+            records: 调用记录列表
+        """
+        # 按记录顺序保存调用关系，堆栈记录先以其在 stack_traces 中的下标占位
+        entries: List[Any] = []
+        stack_traces: List[str] = []
+        first_time = None
+        last_time = None
+        
+        for record in records:
+            is_stack_trace = record.get('logType') == 'stack_trace'
+            try:
+                if is_stack_trace:
+                    # 与 process_stack_trace 一致：不含堆栈的记录只更新时间范围
+                    entry = self._record_stack_trace(record)
+                else:
+                    entry = self._record_call(record)
+                    if entry is None:
+                        continue
+                record_time = self._record_time(record)
+            except (KeyError, TypeError, ValueError) as e:
+                self.logger.warning(f"Skipping invalid record: {e}")
+                continue
+            
+            if is_stack_trace:
+                if entry is not None:
+                    entries.append(len(stack_traces))
+                    stack_traces.append(entry)
+            else:
+                entries.append(entry)
+            
+            if first_time is None:
+                first_time = record_time
+            last_time = record_time
+        
+        if last_time is None:
+            return
+        
+        # 所有堆栈只做一次批量解析
+        trace_calls = self.parse_stack_traces(stack_traces) if stack_traces else []
+        calls: List[Tuple[str, str]] = []
+        for entry in entries:
+            if isinstance(entry, int):
+                calls.extend(trace_calls[entry])
+            else:
+                calls.append(entry)
+        
+        if self.start_time is None:
+            self.start_time = first_time
+        self.end_time = last_time
+        
+        self._add_calls(calls)
+        self._version += 1
 
-    def generate_graph(self) -> nx.DiGraph:
-        """生成调用图"""
-        # 添加节点属性
-        for node_id, node in self.nodes.items():
-            self.graph.add_node(
-                node_id,
-                name=node.name,
-                call_count=node.call_count
-            )
+    def generate_graph(self) -> Any:
+        """生成调用图
+        
+        Returns:
+            networkx 后端返回 nx.DiGraph，igraph 后端返回 igraph.Graph
+        """
+        if self.backend == 'igraph':
+            return self._generate_igraph()
+        
+        # 根据累计的调用次数一次性批量构建节点和边
+        self.graph.add_nodes_from(
+            (name, {'name': name, 'call_count': call_count})
+            for name, call_count in self.node_counts.items()
+        )
+        self.graph.add_edges_from(
+            (source, target, {'call_count': call_count})
+            for (source, target), call_count in self.edge_counts.items()
+        )
         
         return self.graph
 
+    def _generate_igraph(self) -> Any:
+        """使用 igraph 构建调用图，节点和边各一次批量插入"""
+        node_ids = {name: i for i, name in enumerate(self.node_counts)}
+        graph = igraph.Graph(directed=True)
+        graph.add_vertices(
+            len(node_ids),
+            attributes={'name': list(node_ids), 'call_count': list(self.node_counts.values())}
+        )
+        graph.add_edges(
+            [(node_ids[source], node_ids[target]) for source, target in self.edge_counts],
+            attributes={'call_count': list(self.edge_counts.values())}
+        )
+        
+        self.graph = graph
+        return graph
+
     def save_graph(self, format: str = 'json') -> str:
         """保存调用图
         
         Args:
-            format: 保存格式 ('json' 或 'graphml')
+            format: 保存格式 ('json'、'graphml' 或 'binary')
             
         Returns:
             保存的文件路径
@@ -202,75 +326,212 @@ class CallGraphProcessor:
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         
         if format == 'json':
-            # 转换为可序列化的格式
-            graph_data = {
-                'nodes': [
+            metadata = self._metadata()
+            
+            # 逐条序列化写入，避免在内存中构建完整的图数据
+            output_file = self.output_dir / f'call_graph_{timestamp}.json'
+            with open(output_file, 'wb') as f:
+                f.write(b'{\n"nodes": ')
+                self._write_json_array(f, (
                     {
-                        'id': node_id,
-                        'name': data['name'],
-                        'call_count': data['call_count']
+                        'id': name,
+                        'name': name,
+                        'call_count': call_count
                     }
-                    for node_id, data in self.graph.nodes(data=True)
-                ],
-                'edges': [
+                    for name, call_count in self.node_counts.items()
+                ))
+                f.write(b',\n"edges": ')
+                self._write_json_array(f, (
                     {
                         'source': source,
                         'target': target,
-                        'call_count': data['call_count']
+                        'call_count': call_count
                     }
-                    for source, target, data in self.graph.edges(data=True)
-                ],
-                'metadata': {
-                    'total_calls': self.total_calls,
-                    'unique_functions': len(self.nodes),
-                    'unique_calls': len(self.edges),
-                    'start_time': self.start_time.isoformat() if self.start_time else None,
-                    'end_time': self.end_time.isoformat() if self.end_time else None
-                }
-            }
-            
-            output_file = self.output_dir / f'call_graph_{timestamp}.json'
-            with open(output_file, 'w', encoding='utf-8') as f:
-                json.dump(graph_data, f, indent=2, ensure_ascii=False)
+                    for (source, target), call_count in self.edge_counts.items()
+                ))
+                f.write(b',\n"metadata": ')
+                f.write(_json_dumps(metadata))
+                f.write(b'\n}\n')
             
             self.logger.info(f"Call graph saved to {output_file}")
             return str(output_file)
         
         elif format == 'graphml':
             output_file = self.output_dir / f'call_graph_{timestamp}.graphml'
-            nx.write_graphml(self.graph, output_file)
+            if self.backend == 'igraph':
+                self.graph.write_graphml(str(output_file))
+            else:
+                nx.write_graphml(self.graph, output_file)
+            self.logger.info(f"Call graph saved to {output_file}")
+            return str(output_file)
+        
+        elif format == 'binary':
+            output_file = self.output_dir / f'call_graph_{timestamp}.cgb'
+            self._write_binary(output_file)
             self.logger.info(f"Call graph saved to {output_file}")
             return str(output_file)
         
         else:
             raise ValueError(f"Unsupported format: {format}")
 
-    def get_statistics(self) -> Dict[str, Any]:
-        """获取统计信息"""
-        # 按调用次数排序的函数列表
-        sorted_functions = sorted(
-            self.nodes.items(),
-            key=lambda x: x[1].call_count,
-            reverse=True
+    def save_viz_json(self) -> str:
+        """保存可直接嵌入ECharts报告的可视化数据
+        
+        文件共三行：元数据（含调用次数最多的函数）、ECharts节点数组、ECharts边数组。
+        节点和边数组已转义 "</"，可视化器无需解析即可原样写入报告的<script>中。
+        
+        Returns:
+            保存的文件路径
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        output_file = self.output_dir / f'call_graph_{timestamp}_viz.jsonl'
+        
+        metadata = self._metadata()
+        metadata['most_called_functions'] = [
+            {'name': name, 'call_count': call_count}
+            for name, call_count in self.node_counts.most_common(10)
+        ]
+        
+        # 节点和边的转换与报告共用 core.echarts，两条生成报告的路径输出一致
+        with open(output_file, 'wb') as f:
+            f.write(_json_dumps(metadata))
+            f.write(b'\n')
+            write_script_array(f, (
+                echarts_node(name, name, call_count)
+                for name, call_count in self.node_counts.items()
+            ))
+            f.write(b'\n')
+            write_script_array(f, (
+                echarts_link(source, target, call_count)
+                for (source, target), call_count in self.edge_counts.items()
+            ))
+            f.write(b'\n')
+        
+        self.logger.info(f"Visualization data saved to {output_file}")
+        return str(output_file)
+
+    def _metadata(self) -> Dict[str, Any]:
+        """调用图的元数据"""
+        return {
+            'total_calls': self.total_calls,
+            'unique_functions': len(self.node_counts),
+            'unique_calls': len(self.edge_counts),
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None
+        }
+
+    @staticmethod
+    def _write_json_array(f, items: Iterable[Dict[str, Any]]) -> None:
+        """将对象逐个序列化为JSON数组写入文件"""
+        f.write(b'[')
+        separator = b'\n'
+        for item in items:
+            f.write(separator)
+            f.write(_json_dumps(item))
+            separator = b',\n'
+        f.write(b'\n]')
+
+    def _write_binary(self, output_file: Path) -> None:
+        """以二进制格式写入调用图
+        
+        布局：文件头、元数据JSON、以\\0分隔的函数名字符串表、
+        节点调用次数(int64)、边的起点/终点编号(int32)、边调用次数(int64)。
+        """
+        node_ids = {name: i for i, name in enumerate(self.node_counts)}
+        metadata = _json_dumps({
+            'total_calls': self.total_calls,
+            'start_time': self.start_time.isoformat() if self.start_time else None,
+            'end_time': self.end_time.isoformat() if self.end_time else None
+        })
+        strings = '\0'.join(node_ids).encode('utf-8')
+        
+        arrays = (
+            array('q', self.node_counts.values()),
+            array('i', [node_ids[source] for source, _ in self.edge_counts]),
+            array('i', [node_ids[target] for _, target in self.edge_counts]),
+            array('q', self.edge_counts.values()),
+        )
+        
+        with open(output_file, 'wb') as f:
+            f.write(_BINARY_HEADER.pack(
+                _BINARY_MAGIC, len(node_ids), len(self.edge_counts), len(metadata), len(strings)
+            ))
+            f.write(metadata)
+            f.write(strings)
+            for values in arrays:
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                values.tofile(f)
+
+    @staticmethod
+    def load_binary(path: str) -> nx.DiGraph:
+        """读取 save_graph(format='binary') 生成的文件
+        
+        Args:
+            path: 二进制文件路径
+            
+        Returns:
+            调用图，元数据保存在 graph.graph 中
+        """
+        with open(path, 'rb') as f:
+            magic, node_count, edge_count, metadata_len, strings_len = _BINARY_HEADER.unpack(
+                f.read(_BINARY_HEADER.size)
+            )
+            if magic != _BINARY_MAGIC:
+                raise ValueError(f"Not a call graph binary file: {path}")
+            
+            metadata = _json_loads(f.read(metadata_len))
+            strings = f.read(strings_len).decode('utf-8')
+            names = strings.split('\0') if node_count else []
+            
+            arrays = []
+            for typecode, count in (('q', node_count), ('i', edge_count), ('i', edge_count), ('q', edge_count)):
+                values = array(typecode)
+                values.fromfile(f, count)
+                if sys.byteorder == 'big':
+                    values.byteswap()
+                arrays.append(values)
+        
+        node_calls, sources, targets, edge_calls = arrays
+        graph = nx.DiGraph(**metadata)
+        graph.add_nodes_from(
+            (name, {'name': name, 'call_count': call_count})
+            for name, call_count in zip(names, node_calls)
+        )
+        graph.add_edges_from(
+            (names[source], names[target], {'call_count': call_count})
+            for source, target, call_count in zip(sources, targets, edge_calls)
         )
+        return graph
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取统计信息
+        
+        结果会被缓存，直到有新的记录写入；调用方不应修改返回的字典。
+        """
+        # 先读取版本号再计算：计算期间若有写入，版本号已变化，下次调用会重新计算
+        version = self._version
+        cache = self._stats_cache
+        if cache is None or cache[0] != version:
+            cache = (version, self._compute_statistics())
+            self._stats_cache = cache
+        return cache[1]
 
+    def _compute_statistics(self) -> Dict[str, Any]:
+        """计算统计信息"""
         return {
             'total_calls': self.total_calls,
-            'unique_functions': len(self.nodes),
-            'unique_calls': len(self.edges),
+            'unique_functions': len(self.node_counts),
+            'unique_calls': len(self.edge_counts),
             'start_time': self.start_time.isoformat() if self.start_time else None,
             'end_time': self.end_time.isoformat() if self.end_time else None,
-            'most_called_functions': sorted_functions[:10],  # 前10个最常调用的函数
+            'most_called_functions': self.node_counts.most_common(10),  # 前10个最常调用的函数
             'call_relationships': [
                 {
-                    'source': edge.source,
-                    'target': edge.target,
-                    'call_count': edge.call_count
+                    'source': source,
+                    'target': target,
+                    'call_count': call_count
                 }
-                for edge in sorted(
-                    self.edges.values(),
-                    key=lambda x: x.call_count,
-                    reverse=True
-                )[:10]  # 前10个最常见的调用关系
+                for (source, target), call_count in self.edge_counts.most_common(10)  # 前10个最常见的调用关系
             ]
         } 
\ No newline at end of file
@@ -3,12 +3,24 @@ import sys
 import json
 import logging
 import threading
-import queue
+from collections import deque
 from typing import Dict, List, Optional, Any, Callable, Union
 from dataclasses import dataclass
 from pathlib import Path
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库
+    _json_loads = json.loads
+
+# 直接以原始字典转发给回调的日志类型（调用图处理只需要其中的 data 字段）
+_GRAPH_LOG_TYPES = ('call', 'return', 'stack_trace')
+
+# 停止追踪时等待消息线程处理完积压消息的最长时间（秒）
+_STOP_TIMEOUT = 30
+
 @dataclass
 class DeviceInfo:
     id: str
@@ -16,7 +28,7 @@ class DeviceInfo:
     type: str
     is_usb: bool
 
-@dataclass
+@dataclass(slots=True)
 class TraceMessage:
     """追踪消息的数据类"""
     type: str
@@ -32,27 +44,22 @@ class TraceMessage:
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'TraceMessage':
         """从字典创建TraceMessage实例"""
-        # 提取自定义字段
-        custom_fields = {}
-        standard_fields = {
-            'type', 'timestamp', 'logType', 'message', 
-            'method', 'exception', 'exceptionStack', 'stackTrace'
-        }
-        
-        for key, value in data.items():
-            if key not in standard_fields:
-                custom_fields[key] = value
+        # 取出标准字段，剩余的即为自定义字段
+        fields = dict(data)
+        timestamp = fields.pop('timestamp', None)
+        if timestamp is None:
+            timestamp = datetime.now().isoformat()
 
         return cls(
-            type=data.get('type', ''),
-            timestamp=data.get('timestamp', datetime.now().isoformat()),
-            logType=data.get('logType', 'info'),
-            message=data.get('message', ''),
-            method=data.get('method'),
-            exception=data.get('exception'),
-            exceptionStack=data.get('exceptionStack'),
-            stackTrace=data.get('stackTrace'),
-            customFields=custom_fields if custom_fields else None
+            type=fields.pop('type', ''),
+            timestamp=timestamp,
+            logType=fields.pop('logType', 'info'),
+            message=fields.pop('message', ''),
+            method=fields.pop('method', None),
+            exception=fields.pop('exception', None),
+            exceptionStack=fields.pop('exceptionStack', None),
+            stackTrace=fields.pop('stackTrace', None),
+            customFields=fields or None
         )
 
     def to_dict(self) -> Dict[str, Any]:
@@ -105,9 +112,13 @@ class FridaTracer:
         self.device: Optional[frida.core.Device] = None
         self.session: Optional[frida.core.Session] = None
         self.script: Optional[frida.core.Script] = None
-        self.message_queue = queue.Queue()
+        # deque 的 append/popleft 在 GIL 下是原子的，配合 Event 唤醒消息线程
+        self.message_queue: deque = deque()
+        self._wake = threading.Event()
+        self.message_thread: Optional[threading.Thread] = None
         self.is_running = False
-        self.callback: Optional[Callable[[TraceMessage], None]] = None
+        self.callback: Optional[Callable[[Union[TraceMessage, Dict[str, Any]]], None]] = None
+        self.batch_callback: Optional[Callable[[List[Union[TraceMessage, Dict[str, Any]]]], None]] = None
         
         # 配置日志
         logging.basicConfig(
@@ -197,17 +208,23 @@ class FridaTracer:
             self.logger.error(f"Failed to load script {script_path}: {e}")
             return False
 
-    def start_tracing(self, callback: Optional[Callable[[TraceMessage], None]] = None) -> None:
+    def start_tracing(
+        self,
+        callback: Optional[Callable[[Union[TraceMessage, Dict[str, Any]]], None]] = None,
+        batch_callback: Optional[Callable[[List[Union[TraceMessage, Dict[str, Any]]]], None]] = None
+    ) -> None:
         """开始追踪
         
         Args:
-            callback: 处理TraceMessage的回调函数
+            callback: 处理消息的回调函数，调用图相关的记录以原始字典传入，其余为TraceMessage
+            batch_callback: 批量处理消息的回调函数，设置后代替 callback 接收每批积压的消息
         """
         if not self.script:
             self.logger.error("No script loaded")
             return
 
         self.callback = callback
+        self.batch_callback = batch_callback
         self.is_running = True
         
         # 启动消息处理线程
@@ -229,36 +246,44 @@ class FridaTracer:
 
         try:
             self.script.post({'type': 'stop'})
-            self.is_running = False
-            self.logger.info("Tracing stopped")
         except Exception as e:
             self.logger.error(f"Failed to stop tracing: {e}")
+        
+        self.is_running = False
+        self._wake.set()
+        # 等待消息线程处理完剩余的消息，之后调用方才能安全地读取处理结果
+        if self.message_thread is not None and self.message_thread is not threading.current_thread():
+            self.message_thread.join(timeout=_STOP_TIMEOUT)
+            if self.message_thread.is_alive():
+                self.logger.warning("Message thread did not finish within timeout, some messages may be lost")
+            self.message_thread = None
+        self.logger.info("Tracing stopped")
 
     def _on_message(self, message: Dict[str, Any], data: Optional[bytes]) -> None:
         """处理来自脚本的消息"""
         if message['type'] == 'send':
             try:
+                # agent 通过 send(obj) 发送对象，frida 已将其解析为字典；
+                # 字符串 payload 仅用于兼容仍使用 JSON.stringify 的旧版脚本
                 payload = message['payload']
-                if isinstance(payload, str):
-                    # 处理字符串格式的payload
-                    payload = json.loads(payload)
+                if not isinstance(payload, dict):
+                    payload = _json_loads(payload)
                 
                 if payload.get('type') == 'trace':
-                    trace_message = TraceMessage.from_dict(payload)
-                    
-                    # 特殊处理函数调用数据
-                    if trace_message.logType in ['call', 'return'] and trace_message.customFields and 'data' in trace_message.customFields:
-                        call_data = trace_message.customFields['data']
+                    log_type = payload.get('logType')
+                    if log_type in _GRAPH_LOG_TYPES:
+                        # 调用图相关的记录直接以原始字典交给回调，无需构造TraceMessage
+                        call_data = payload.get('data')
                         # 确保调用数据包含所有必要字段
-                        if all(k in call_data for k in ['caller', 'callee', 'timestamp']):
-                            self.message_queue.put(trace_message)
-                        else:
+                        if log_type != 'stack_trace' and call_data and not all(k in call_data for k in ['caller', 'callee', 'timestamp']):
                             self.logger.warning(f"Invalid call data format: {call_data}")
+                        else:
+                            self._enqueue(payload)
                     else:
-                        self.message_queue.put(trace_message)
+                        self._enqueue(TraceMessage.from_dict(payload))
                 else:
                     # 处理其他类型的消息
-                    self.message_queue.put(payload)
+                    self._enqueue(payload)
             except json.JSONDecodeError as e:
                 self.logger.error(f"Failed to parse message payload: {e}")
             except Exception as e:
@@ -266,32 +291,72 @@ class FridaTracer:
         elif message['type'] == 'error':
             self.logger.error(f"Script error: {message['description']}")
 
+    def _enqueue(self, message: Union[TraceMessage, Dict[str, Any]]) -> None:
+        """将消息放入队列并唤醒消息处理线程"""
+        self.message_queue.append(message)
+        self._wake.set()
+
     def _message_loop(self) -> None:
         """消息处理循环"""
         while self.is_running:
+            self._wake.wait(timeout=1)
+            self._wake.clear()
+            self._drain()
+        
+        # 停止后处理最后一批积压的消息
+        self._drain()
+
+    def _drain(self) -> None:
+        """一次取出当前积压的全部消息，按批处理"""
+        batch = []
+        popleft = self.message_queue.popleft
+        while self.message_queue:
+            batch.append(popleft())
+        if batch:
+            self._dispatch_batch(batch)
+
+    def _dispatch_batch(self, batch: List[Union[TraceMessage, Dict[str, Any]]]) -> None:
+        """将一批消息交给回调处理"""
+        if not self.callback and not self.batch_callback:
+            return
+        
+        messages = [message for message in batch if self._accept(message)]
+        if not messages:
+            return
+        
+        if self.batch_callback:
             try:
-                message = self.message_queue.get(timeout=1)
-                if self.callback:
-                    if isinstance(message, TraceMessage):
-                        # 处理函数调用消息
-                        if message.logType in ['call', 'return'] and message.customFields and 'data' in message.customFields:
-                            call_data = message.customFields['data']
-                            if call_data.get('type') in ['call', 'return']:
-                                self.callback(message)
-                            else:
-                                self.logger.warning(f"Invalid call type in data: {call_data}")
-                        else:
-                            # 处理其他类型的消息
-                            self.callback(message)
-                    else:
-                        # 处理旧格式的消息
-                        self.logger.warning(f"Received old format message: {message}")
-            except queue.Empty:
-                continue
+                self.batch_callback(messages)
+            except Exception as e:
+                self.logger.error(f"Error in message loop: {e}")
+                self.logger.exception(e)
+            return
+        
+        for message in messages:
+            try:
+                self.callback(message)
             except Exception as e:
                 self.logger.error(f"Error in message loop: {e}")
                 self.logger.exception(e)
 
+    def _accept(self, message: Union[TraceMessage, Dict[str, Any]]) -> bool:
+        """检查消息是否应交给回调处理"""
+        if isinstance(message, TraceMessage):
+            return True
+        
+        if message.get('type') == 'trace':
+            # 处理函数调用消息
+            call_data = message.get('data')
+            if message.get('logType') in ['call', 'return'] and call_data:
+                if call_data.get('type') not in ['call', 'return']:
+                    self.logger.warning(f"Invalid call type in data: {call_data}")
+                    return False
+            return True
+        
+        # 处理旧格式的消息
+        self.logger.warning(f"Received old format message: {message}")
+        return False
+
     def cleanup(self) -> None:
         """清理资源"""
         self.stop_tracing()
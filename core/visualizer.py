@@ -1,342 +1,361 @@
 import os
+import heapq
+import shutil
+import hashlib
 import logging
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple, Iterable, Iterator, Union
 import json
 from datetime import datetime
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库
+    _json_loads = json.loads
+
+from core.echarts import echarts_node, echarts_link, write_script_array
+
+# ECharts 脚本的CDN地址，首次使用时缓存到输出目录，报告通过相对路径引用本地副本
+_ECHARTS_URL = "https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"
+_ECHARTS_FILE = "echarts.min.js"
+
+# 报告格式版本，参与报告缓存的键；统计表格或节点/边转换的输出变化时递增，使旧缓存失效
+_REPORT_VERSION = 1
+
+# 写HTML报告时使用的缓冲区大小（256KB），减少大图写入时的系统调用次数
+_WRITE_BUFFER_SIZE = 1 << 18
+
+# HTML报告的静态部分，花括号均为CSS/JS原文，无需转义。
+# 唯一的占位符 {echarts_src} 由 _static_skeleton 通过 str.replace 替换，
+# 不要改用 f-string 或 str.format，否则CSS/JS中的花括号会被当作插值字段
+_HTML_PREFIX = """<!DOCTYPE html>
+<html>
+<head>
+    <title>Function Call Graph Report</title>
+    <meta charset="utf-8">
+    <script src="{echarts_src}"></script>
+    <style>
+        body { 
+            font-family: Arial, sans-serif; 
+            margin: 20px;
+            background-color: #f5f5f5;
+        }
+        .container { 
+            max-width: 1400px; 
+            margin: 0 auto;
+            background-color: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .header {
+            text-align: center;
+            margin-bottom: 30px;
+            padding-bottom: 20px;
+            border-bottom: 1px solid #eee;
+        }
+        .graph-container {
+            margin: 20px 0;
+            padding: 20px;
+            background-color: white;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+            height: 800px;  /* 设置图表容器高度 */
+        }
+        .stats { 
+            margin: 20px 0;
+            display: grid;
+            grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
+            gap: 20px;
+        }
+        .stat-card {
+            background-color: white;
+            padding: 20px;
+            border-radius: 8px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+        .stat-card h3 {
+            margin-top: 0;
+            color: #333;
+            border-bottom: 2px solid #eee;
+            padding-bottom: 10px;
+        }
+        table { 
+            width: 100%;
+            border-collapse: collapse;
+            margin: 10px 0;
+        }
+        th, td { 
+            padding: 12px;
+            text-align: left;
+            border-bottom: 1px solid #eee;
+        }
+        th { 
+            background-color: #f8f9fa;
+            font-weight: bold;
+        }
+        tr:hover { 
+            background-color: #f5f5f5;
+        }
+        .controls {
+            margin: 20px 0;
+            padding: 15px;
+            background-color: #f8f9fa;
+            border-radius: 8px;
+            display: flex;
+            gap: 10px;
+            flex-wrap: wrap;
+        }
+        .search-box {
+            padding: 8px;
+            border: 1px solid #ddd;
+            border-radius: 4px;
+            flex-grow: 1;
+        }
+        .tooltip {
+            background-color: rgba(255, 255, 255, 0.9);
+            border: 1px solid #ccc;
+            border-radius: 4px;
+            padding: 10px;
+            box-shadow: 0 2px 4px rgba(0,0,0,0.1);
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+"""
+
+_HTML_MID = """        
+        <div class="graph-container" id="graph"></div>
+    </div>
+
+    <script>
+        // 初始化ECharts实例
+        var chartDom = document.getElementById('graph');
+        var myChart = echarts.init(chartDom);
+        
+        // 准备数据
+"""
+
+_HTML_SUFFIX = """        
+        // 配置项
+        var option = {
+            tooltip: {
+                trigger: 'item',
+                formatter: function(params) {
+                    if (params.dataType === 'node') {
+                        return `<div class="tooltip">
+                            <strong>${echarts.format.encodeHTML(params.data.name)}</strong><br/>
+                            Call Count: ${params.data.value}
+                        </div>`;
+                    } else {
+                        return `<div class="tooltip">
+                            <strong>${echarts.format.encodeHTML(params.data.source)} → ${echarts.format.encodeHTML(params.data.target)}</strong><br/>
+                            Call Count: ${params.data.value}
+                        </div>`;
+                    }
+                }
+            },
+            legend: {
+                show: false
+            },
+            animationDuration: 1500,
+            animationEasingUpdate: 'quinticInOut',
+            series: [{
+                type: 'graph',
+                layout: 'force',
+                data: nodes,
+                links: links,
+                categories: [{
+                    name: 'Function'
+                }],
+                roam: true,
+                label: {
+                    show: true,
+                    position: 'right',
+                    formatter: '{b}',
+                    fontSize: 12,
+                    backgroundColor: 'rgba(255, 255, 255, 0.7)',
+                    padding: [4, 8],
+                    borderRadius: 4
+                },
+                force: {
+                    repulsion: 200,
+                    edgeLength: [80, 200],
+                    gravity: 0.2,
+                    layoutAnimation: true
+                },
+                lineStyle: {
+                    color: '#666',
+                    curveness: 0.3,
+                    width: 2,
+                    opacity: 0.7
+                },
+                edgeSymbol: ['none', 'arrow'],
+                edgeSymbolSize: [0, 8],
+                edgeLabel: {
+                    show: true,
+                    formatter: function(params) {
+                        return params.data.value;
+                    },
+                    fontSize: 10,
+                    backgroundColor: 'rgba(255, 255, 255, 0.7)',
+                    padding: [2, 4],
+                    borderRadius: 2
+                },
+                itemStyle: {
+                    color: '#5470c6',
+                    borderColor: '#fff',
+                    borderWidth: 2,
+                    shadowColor: 'rgba(0, 0, 0, 0.2)',
+                    shadowBlur: 10
+                },
+                emphasis: {
+                    focus: 'adjacency',
+                    lineStyle: {
+                        width: 4,
+                        opacity: 1
+                    },
+                    edgeLabel: {
+                        show: true,
+                        fontSize: 12,
+                        backgroundColor: 'rgba(255, 255, 255, 0.9)'
+                    },
+                    itemStyle: {
+                        color: '#ffeb3b',
+                        shadowBlur: 20
+                    }
+                }
+            }]
+        };
+        
+        // 使用配置项
+        myChart.setOption(option);
+        
+        // 搜索功能：函数名只转换一次小写，输入时仅高亮匹配的节点，不重新设置整个配置
+        const lowerNames = nodes.map(node => node.name.toLowerCase());
+        document.getElementById('searchBox').addEventListener('input', function(e) {
+            const searchText = e.target.value.toLowerCase();
+            myChart.dispatchAction({ type: 'downplay', seriesIndex: 0 });
+            if (!searchText) {
+                return;
+            }
+            
+            const matches = [];
+            lowerNames.forEach((name, index) => {
+                if (name.includes(searchText)) {
+                    matches.push(index);
+                }
+            });
+            if (matches.length) {
+                myChart.dispatchAction({ type: 'highlight', seriesIndex: 0, dataIndex: matches });
+            }
+        });
+        
+        // 响应窗口大小变化
+        window.addEventListener('resize', function() {
+            myChart.resize();
+        });
+    </script>
+</body>
+</html>
+"""
+
+# HTML转义表（C++模板、Java泛型等函数名中可能含有 < > &），str.translate 一次遍历完成转义
+_HTML_ESCAPE = str.maketrans({'&': '&amp;', '<': '&lt;', '>': '&gt;', '"': '&quot;'})
+
+# 函数调用次数表格的行模板
+_FUNCTION_ROW = "<tr><td>{}</td><td>{}</td></tr>"
+
 class CallGraphVisualizer:
     def __init__(self, output_dir: str):
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
-        # 配置日志
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
+        # 日志由调用方（main.setup_logging）统一配置
         self.logger = logging.getLogger('CallGraphVisualizer')
+        
+        # 报告引用的ECharts脚本地址：本地缓存可用时使用相对路径，否则回退到CDN
+        self.echarts_src = _ECHARTS_FILE if self._cache_echarts() else _ECHARTS_URL
+        
+        # 已生成报告的缓存目录，以输入内容的哈希为文件名
+        self.cache_dir = self.output_dir / 'cache'
+
+    def _cache_echarts(self) -> bool:
+        """将ECharts脚本下载到输出目录，已存在时直接复用"""
+        echarts_file = self.output_dir / _ECHARTS_FILE
+        if echarts_file.exists():
+            return True
+        
+        import urllib.request
+        temp_file = echarts_file.with_name(echarts_file.name + '.part')
+        try:
+            # 先写入临时文件再改名，避免下载中断时留下不完整的脚本
+            with urllib.request.urlopen(_ECHARTS_URL, timeout=10) as response, open(temp_file, 'wb') as f:
+                f.write(response.read())
+            temp_file.replace(echarts_file)
+            self.logger.info(f"ECharts cached to {echarts_file}")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to cache ECharts, falling back to CDN: {e}")
+            temp_file.unlink(missing_ok=True)
+            return False
 
     def generate_html_report(self, json_file: str) -> str:
         """生成HTML格式的调用图报告
         
         Args:
-            json_file: JSON文件路径
+            json_file: save_graph 生成的JSON文件，或 save_viz_json 生成的 *_viz.jsonl 文件
             
         Returns:
             生成的HTML报告文件路径
         """
         try:
-            # 读取JSON数据
-            with open(json_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            # 准备ECharts数据
-            nodes = []
-            links = []
+            # 读取JSON数据（整文件一次读入，不经过缓冲读取层）
+            source = Path(json_file).read_bytes()
+            is_viz = Path(json_file).stem.endswith('_viz')
+            output_file = self.output_dir / f"call_graph_report_{Path(json_file).stem}.html"
             
-            # 处理节点
-            for node in data['nodes']:
-                nodes.append({
-                    'id': node['id'],
-                    'name': node['name'],
-                    'symbolSize': min(30, 10 + node['call_count']),  # 根据调用次数调整节点大小
-                    'value': node['call_count'],
-                    'category': 0
-                })
+            # 报告完全由输入内容决定，相同输入直接复用缓存的HTML
+            cache_file = self.cache_dir / f"{self._cache_key(source, is_viz)}.html"
+            if cache_file.exists():
+                self._link_or_copy(cache_file, output_file)
+                self.logger.info(f"HTML report saved to {output_file} (cached)")
+                return str(output_file)
             
-            # 处理边
-            for edge in data['edges']:
-                links.append({
-                    'source': edge['source'],
-                    'target': edge['target'],
-                    'value': edge['call_count'],
-                    'lineStyle': {
-                        'width': min(5, 1 + edge['call_count'] / 10)  # 根据调用次数调整边宽度
-                    }
-                })
+            if is_viz:
+                # CallGraphProcessor.save_viz_json 生成的数据已是ECharts格式，节点和边原样写入报告
+                metadata_line, nodes_json, links_json = source.split(b'\n', 2)
+                metadata = _json_loads(metadata_line)
+                top_nodes = metadata['most_called_functions']
+                links_json = links_json.rstrip(b'\n')
+            else:
+                data = _json_loads(source)
+                del source
+                metadata = data['metadata']
+                top_nodes = heapq.nlargest(10, data['nodes'], key=lambda x: x['call_count'])
+                # 节点和边在写入时逐个转换，不预先构造完整的ECharts数组
+                nodes_json = self._echarts_nodes(data['nodes'])
+                links_json = self._echarts_links(data['edges'])
             
-            # 生成HTML内容
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <title>Function Call Graph Report</title>
-                <meta charset="utf-8">
-                <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
-                <style>
-                    body {{ 
-                        font-family: Arial, sans-serif; 
-                        margin: 20px;
-                        background-color: #f5f5f5;
-                    }}
-                    .container {{ 
-                        max-width: 1400px; 
-                        margin: 0 auto;
-                        background-color: white;
-                        padding: 20px;
-                        border-radius: 8px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    .header {{
-                        text-align: center;
-                        margin-bottom: 30px;
-                        padding-bottom: 20px;
-                        border-bottom: 1px solid #eee;
-                    }}
-                    .graph-container {{
-                        margin: 20px 0;
-                        padding: 20px;
-                        background-color: white;
-                        border-radius: 8px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                        height: 800px;  /* 设置图表容器高度 */
-                    }}
-                    .stats {{ 
-                        margin: 20px 0;
-                        display: grid;
-                        grid-template-columns: repeat(auto-fit, minmax(300px, 1fr));
-                        gap: 20px;
-                    }}
-                    .stat-card {{
-                        background-color: white;
-                        padding: 20px;
-                        border-radius: 8px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                    .stat-card h3 {{
-                        margin-top: 0;
-                        color: #333;
-                        border-bottom: 2px solid #eee;
-                        padding-bottom: 10px;
-                    }}
-                    table {{ 
-                        width: 100%;
-                        border-collapse: collapse;
-                        margin: 10px 0;
-                    }}
-                    th, td {{ 
-                        padding: 12px;
-                        text-align: left;
-                        border-bottom: 1px solid #eee;
-                    }}
-                    th {{ 
-                        background-color: #f8f9fa;
-                        font-weight: bold;
-                    }}
-                    tr:hover {{ 
-                        background-color: #f5f5f5;
-                    }}
-                    .controls {{
-                        margin: 20px 0;
-                        padding: 15px;
-                        background-color: #f8f9fa;
-                        border-radius: 8px;
-                        display: flex;
-                        gap: 10px;
-                        flex-wrap: wrap;
-                    }}
-                    .search-box {{
-                        padding: 8px;
-                        border: 1px solid #ddd;
-                        border-radius: 4px;
-                        flex-grow: 1;
-                    }}
-                    .tooltip {{
-                        background-color: rgba(255, 255, 255, 0.9);
-                        border: 1px solid #ccc;
-                        border-radius: 4px;
-                        padding: 10px;
-                        box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-                    }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>Function Call Graph Report</h1>
-                        <p>Generated at: {data['metadata']['end_time']}</p>
-                    </div>
-                    
-                    <div class="controls">
-                        <input type="text" id="searchBox" class="search-box" placeholder="Search functions...">
-                    </div>
-                    
-                    <div class="stats">
-                        <div class="stat-card">
-                            <h3>Statistics</h3>
-                            <table>
-                                <tr>
-                                    <td>Total Calls</td>
-                                    <td>{data['metadata']['total_calls']}</td>
-                                </tr>
-                                <tr>
-                                    <td>Unique Functions</td>
-                                    <td>{data['metadata']['unique_functions']}</td>
-                                </tr>
-                                <tr>
-                                    <td>Unique Call Relationships</td>
-                                    <td>{data['metadata']['unique_calls']}</td>
-                                </tr>
-                                <tr>
-                                    <td>Start Time</td>
-                                    <td>{data['metadata']['start_time']}</td>
-                                </tr>
-                                <tr>
-                                    <td>End Time</td>
-                                    <td>{data['metadata']['end_time']}</td>
-                                </tr>
-                            </table>
-                        </div>
-                        
-                        <div class="stat-card">
-                            <h3>Most Called Functions</h3>
-                            <table>
-                                <tr>
-                                    <th>Function</th>
-                                    <th>Calls</th>
-                                </tr>
-                                {self._generate_function_table_rows(sorted(data['nodes'], key=lambda x: x['call_count'], reverse=True)[:10])}
-                            </table>
-                        </div>
-                    </div>
-                    
-                    <div class="graph-container" id="graph"></div>
-                </div>
-
-                <script>
-                    // 初始化ECharts实例
-                    var chartDom = document.getElementById('graph');
-                    var myChart = echarts.init(chartDom);
-                    
-                    // 准备数据
-                    var nodes = {json.dumps(nodes)};
-                    var links = {json.dumps(links)};
-                    
-                    // 配置项
-                    var option = {{
-                        tooltip: {{
-                            trigger: 'item',
-                            formatter: function(params) {{
-                                if (params.dataType === 'node') {{
-                                    return `<div class="tooltip">
-                                        <strong>${{params.data.name}}</strong><br/>
-                                        Call Count: ${{params.data.value}}
-                                    </div>`;
-                                }} else {{
-                                    return `<div class="tooltip">
-                                        <strong>${{params.data.source}} → ${{params.data.target}}</strong><br/>
-                                        Call Count: ${{params.data.value}}
-                                    </div>`;
-                                }}
-                            }}
-                        }},
-                        legend: {{
-                            show: false
-                        }},
-                        animationDuration: 1500,
-                        animationEasingUpdate: 'quinticInOut',
-                        series: [{{
-                            type: 'graph',
-                            layout: 'force',
-                            data: nodes,
-                            links: links,
-                            categories: [{{
-                                name: 'Function'
-                            }}],
-                            roam: true,
-                            label: {{
-                                show: true,
-                                position: 'right',
-                                formatter: '{{b}}',
-                                fontSize: 12,
-                                backgroundColor: 'rgba(255, 255, 255, 0.7)',
-                                padding: [4, 8],
-                                borderRadius: 4
-                            }},
-                            force: {{
-                                repulsion: 200,
-                                edgeLength: [80, 200],
-                                gravity: 0.2,
-                                layoutAnimation: true
-                            }},
-                            lineStyle: {{
-                                color: '#666',
-                                curveness: 0.3,
-                                width: 2,
-                                opacity: 0.7
-                            }},
-                            edgeSymbol: ['none', 'arrow'],
-                            edgeSymbolSize: [0, 8],
-                            edgeLabel: {{
-                                show: true,
-                                formatter: function(params) {{
-                                    return params.data.value;
-                                }},
-                                fontSize: 10,
-                                backgroundColor: 'rgba(255, 255, 255, 0.7)',
-                                padding: [2, 4],
-                                borderRadius: 2
-                            }},
-                            itemStyle: {{
-                                color: '#5470c6',
-                                borderColor: '#fff',
-                                borderWidth: 2,
-                                shadowColor: 'rgba(0, 0, 0, 0.2)',
-                                shadowBlur: 10
-                            }},
-                            emphasis: {{
-                                focus: 'adjacency',
-                                lineStyle: {{
-                                    width: 4,
-                                    opacity: 1
-                                }},
-                                edgeLabel: {{
-                                    show: true,
-                                    fontSize: 12,
-                                    backgroundColor: 'rgba(255, 255, 255, 0.9)'
-                                }},
-                                itemStyle: {{
-                                    shadowBlur: 20
-                                }}
-                            }}
-                        }}]
-                    }};
-                    
-                    // 使用配置项
-                    myChart.setOption(option);
-                    
-                    // 搜索功能
-                    document.getElementById('searchBox').addEventListener('input', function(e) {{
-                        const searchText = e.target.value.toLowerCase();
-                        const option = myChart.getOption();
-                        
-                        option.series[0].data.forEach(node => {{
-                            const name = node.name.toLowerCase();
-                            if (name.includes(searchText)) {{
-                                node.itemStyle = {{ color: '#ffeb3b' }};
-                            }} else {{
-                                node.itemStyle = {{ color: '#5470c6' }};
-                            }}
-                        }});
-                        
-                        myChart.setOption(option);
-                    }});
-                    
-                    // 响应窗口大小变化
-                    window.addEventListener('resize', function() {{
-                        myChart.resize();
-                    }});
-                </script>
-            </body>
-            </html>
-            """
-            
-            # 保存HTML文件
-            output_file = self.output_dir / f"call_graph_report_{Path(json_file).stem}.html"
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            # 保存HTML文件：缓存的静态骨架与动态片段依次写入，不在内存中拼接完整页面
+            prefix, mid, suffix = self._static_skeleton(self.echarts_src)
+            # 旧报告可能是缓存文件的硬链接，先删除再写入，避免原地覆盖缓存内容
+            output_file.unlink(missing_ok=True)
+            with open(output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                f.write(prefix)
+                f.write(self._generate_stats_html(metadata, top_nodes).encode('utf-8'))
+                f.write(mid)
+                f.write(b'        var nodes = ')
+                self._write_script_data(f, nodes_json)
+                f.write(b';\n        var links = ')
+                self._write_script_data(f, links_json)
+                f.write(b';\n')
+                f.write(suffix)
             
+            self._store_cache(output_file, cache_file)
             self.logger.info(f"HTML report saved to {output_file}")
             return str(output_file)
             
@@ -344,15 +363,134 @@ class CallGraphVisualizer:
             self.logger.error(f"Failed to generate HTML report: {e}")
             raise
 
+    def _cache_key(self, source: bytes, is_viz: bool) -> str:
+        """根据输入内容、输入格式和报告模板计算报告缓存的键
+        
+        静态骨架（含ECharts脚本地址）直接参与哈希，模板修改后旧缓存自动失效；
+        统计表格和节点/边转换的输出变化时需递增 _REPORT_VERSION。
+        """
+        digest = hashlib.blake2b(source, digest_size=16)
+        digest.update(b'\0viz' if is_viz else b'\0json')
+        digest.update(_REPORT_VERSION.to_bytes(4, 'little'))
+        for part in self._static_skeleton(self.echarts_src):
+            digest.update(part)
+        return digest.hexdigest()
+
+    def _store_cache(self, output_file: Path, cache_file: Path) -> None:
+        """将生成的报告保存到缓存目录，缓存失败不影响报告本身"""
+        try:
+            self.cache_dir.mkdir(exist_ok=True)
+            self._link_or_copy(output_file, cache_file)
+        except OSError as e:
+            self.logger.warning(f"Failed to cache HTML report: {e}")
+
+    @staticmethod
+    def _link_or_copy(source: Path, target: Path) -> None:
+        """以硬链接的方式将文件放到目标路径，缓存不额外占用磁盘；不支持硬链接时回退为复制"""
+        # 目标已是同一文件的硬链接时无需处理（此时改名不会生效，会留下临时文件）
+        if target.exists() and os.path.samefile(source, target):
+            return
+        
+        # 先写入临时文件再改名，目标已存在时直接替换，也不会留下不完整的文件
+        temp_file = target.with_name(target.name + '.part')
+        temp_file.unlink(missing_ok=True)
+        try:
+            try:
+                os.link(source, temp_file)
+            except OSError:
+                shutil.copyfile(source, temp_file)
+            temp_file.replace(target)
+        except OSError:
+            temp_file.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    @lru_cache(maxsize=2)
+    def _static_skeleton(cls, echarts_src: str) -> Tuple[bytes, bytes, bytes]:
+        """返回编码后的静态HTML片段（头部/CSS、图表容器、ECharts配置脚本），每种脚本地址只编码一次"""
+        return (
+            _HTML_PREFIX.replace('{echarts_src}', echarts_src).encode('utf-8'),
+            _HTML_MID.encode('utf-8'),
+            _HTML_SUFFIX.encode('utf-8'),
+        )
+
+    @staticmethod
+    def _write_script_data(f, data: Union[bytes, Iterable[Dict[str, Any]]]) -> None:
+        """写入<script>中的数组：bytes 为已序列化的JSON，原样写入；否则逐个序列化元素写入"""
+        if isinstance(data, bytes):
+            f.write(data)
+        else:
+            write_script_array(f, data)
+
+    @staticmethod
+    def _echarts_nodes(nodes: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """将调用图JSON的节点逐个转换为ECharts节点"""
+        for node in nodes:
+            yield echarts_node(node['id'], node['name'], node['call_count'])
+
+    @staticmethod
+    def _echarts_links(edges: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """将调用图JSON的边逐个转换为ECharts边"""
+        for edge in edges:
+            yield echarts_link(edge['source'], edge['target'], edge['call_count'])
+
+    def _generate_stats_html(self, metadata: Dict[str, Any], top_nodes: list) -> str:
+        """生成报告头部和统计信息部分的HTML"""
+        function_rows = self._generate_function_table_rows(top_nodes)
+        total_calls, unique_functions, unique_calls, start_time, end_time = (
+            metadata['total_calls'], metadata['unique_functions'], metadata['unique_calls'],
+            metadata['start_time'], metadata['end_time']
+        )
+        return f"""        <div class="header">
+            <h1>Function Call Graph Report</h1>
+            <p>Generated at: {end_time}</p>
+        </div>
+        
+        <div class="controls">
+            <input type="text" id="searchBox" class="search-box" placeholder="Search functions...">
+        </div>
+        
+        <div class="stats">
+            <div class="stat-card">
+                <h3>Statistics</h3>
+                <table>
+                    <tr>
+                        <td>Total Calls</td>
+                        <td>{total_calls}</td>
+                    </tr>
+                    <tr>
+                        <td>Unique Functions</td>
+                        <td>{unique_functions}</td>
+                    </tr>
+                    <tr>
+                        <td>Unique Call Relationships</td>
+                        <td>{unique_calls}</td>
+                    </tr>
+                    <tr>
+                        <td>Start Time</td>
+                        <td>{start_time}</td>
+                    </tr>
+                    <tr>
+                        <td>End Time</td>
+                        <td>{end_time}</td>
+                    </tr>
+                </table>
+            </div>
+            
+            <div class="stat-card">
+                <h3>Most Called Functions</h3>
+                <table>
+                    <tr>
+                        <th>Function</th>
+                        <th>Calls</th>
+                    </tr>
+                    {function_rows}
+                </table>
+            </div>
+        </div>
+"""
+
     def _generate_function_table_rows(self, nodes: list) -> str:
         """生成函数表格的HTML行"""
-        rows = []
-        for node in nodes:
-            name = node['name']
-            rows.append(f"""
-                <tr>
-                    <td>{name}</td>
-                    <td>{node['call_count']}</td>
-                </tr>
-            """)
-        return '\n'.join(rows) 
\ No newline at end of file
+        row = _FUNCTION_ROW.format
+        return ''.join(row(node['name'].translate(_HTML_ESCAPE), node['call_count']) for node in nodes)
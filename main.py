@@ -1,18 +1,14 @@
 #!/usr/bin/env python3
 import os
 import sys
-import json
-import yaml
 import logging
 import argparse
-import time
-import webbrowser
+import signal
+import threading
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, List, Optional, Union
 
-from core.tracer import FridaTracer, TraceMessage
-from core.processor import CallGraphProcessor
-from core.visualizer import CallGraphVisualizer
+# frida、yaml 等较重的模块在实际用到时才导入，--help 等路径无需加载
 
 def load_config(config_path: Path) -> Dict[str, Any]:
     """加载配置文件"""
@@ -21,8 +17,10 @@ def load_config(config_path: Path) -> Dict[str, Any]:
     
     with open(config_path, 'r', encoding='utf-8') as f:
         if config_path.suffix == '.yaml':
+            import yaml
             return yaml.safe_load(f)
         elif config_path.suffix == '.json':
+            import json
             return json.load(f)
         else:
             raise ValueError(f"Unsupported config file format: {config_path.suffix}")
@@ -43,6 +41,8 @@ def main():
     parser.add_argument('--log-level', '-l', default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR'],
                       help='Logging level')
     parser.add_argument('--no-spawn', action='store_true', help='Disable spawn mode and attach to running process')
+    parser.add_argument('--graph-backend', default='networkx', choices=['networkx', 'igraph'],
+                      help='Graph library used to build the call graph')
     args = parser.parse_args()
 
     # 设置日志
@@ -54,6 +54,9 @@ def main():
         config = load_config(Path(args.config))
         logger.info(f"Loaded config from {args.config}")
 
+        from core.tracer import FridaTracer, TraceMessage
+        from core.processor import CallGraphProcessor
+
         # 初始化追踪器
         tracer = FridaTracer(args.config)
         
@@ -113,37 +116,40 @@ def main():
                 return 1
         
         # 初始化处理器
-        processor = CallGraphProcessor(args.output)
+        processor = CallGraphProcessor(args.output, backend=args.graph_backend)
         
         # 定义消息回调
-        def on_message(message: Union[TraceMessage, Dict[str, Any]]) -> None:
-            """处理来自Frida的消息
+        def on_messages(messages: List[Union[TraceMessage, Dict[str, Any]]]) -> None:
+            """批量处理来自Frida的消息
             
             Args:
-                message: TraceMessage对象或字典格式的消息
+                messages: 一批TraceMessage对象或字典格式的消息
             """
-            if isinstance(message, TraceMessage):
-                # 处理新的TraceMessage格式
-                if message.logType == 'stack_trace':
-                    # 处理堆栈信息
-                    processor.process_call_record(message.to_dict())
-                else:
+            debug = logger.isEnabledFor(logging.DEBUG)
+            records = []
+            for message in messages:
+                if isinstance(message, TraceMessage):
                     # 处理其他类型的日志消息
-                    logger.debug(message.format_message())
-            else:
-                # 处理旧格式的消息
-                if message.get('type') == 'trace':
-                    if message.get('logType') == 'stack_trace':
-                        # 处理新的堆栈信息格式
-                        processor.process_call_record(message)
-                    elif message.get('logType') in ['call', 'return']:
-                        # 处理旧的调用记录格式
-                        if 'data' in message:
-                            processor.process_call_record(message)
-                    else:
-                        logger.debug(f"Received message: {message}")
-                else:
+                    if debug:
+                        logger.debug(message.format_message())
+                elif message.get('type') == 'trace' and message.get('logType') in ['stack_trace', 'call', 'return']:
+                    # 堆栈信息和调用记录交给处理器批量处理
+                    records.append(message)
+                elif debug:
                     logger.debug(f"Received message: {message}")
+            
+            if not records:
+                return
+            try:
+                processor.process_many(records)
+            except Exception as e:
+                # 批量处理失败时逐条重试，单条异常记录只影响其自身
+                logger.error(f"Failed to process message batch, retrying one by one: {e}")
+                for record in records:
+                    try:
+                        processor.process_call_record(record)
+                    except Exception as e:
+                        logger.warning(f"Skipping invalid record: {e}")
         
         # 加载并启动脚本
         script_path = Path('agents/_agent.js')
@@ -157,29 +163,38 @@ def main():
         
         # 开始追踪
         logger.info(f"Starting trace for {package_name} in {'spawn' if should_spawn else 'attach'} mode")
-        tracer.start_tracing(callback=on_message)
+        tracer.start_tracing(batch_callback=on_messages)
         
+        # Ctrl+C 只设置停止事件，主线程阻塞等待，追踪期间不再周期性唤醒
+        stop_event = threading.Event()
+        previous_handler = signal.signal(signal.SIGINT, lambda signum, frame: stop_event.set())
         try:
             # 等待用户中断
             logger.info("Tracing started. Press Ctrl+C to stop...")
-            while True:
-                time.sleep(1)
-        except KeyboardInterrupt:
+            # Windows 上的锁等待无法被信号打断，需要定期醒来检查
+            timeout = 1 if os.name == 'nt' else None
+            while not stop_event.wait(timeout):
+                pass
             logger.info("Stopping trace...")
         finally:
+            signal.signal(signal.SIGINT, previous_handler)
+            
             # 停止追踪
             tracer.stop_tracing()
             
             # 生成并保存图
             graph = processor.generate_graph()
-            json_file = processor.save_graph(format='json')
+            processor.save_graph(format='json')
             processor.save_graph(format='graphml')
+            viz_file = processor.save_viz_json()
             
             # 生成可视化
+            import webbrowser
+            from core.visualizer import CallGraphVisualizer
             visualizer = CallGraphVisualizer(args.output)
             try:
-                # 生成HTML报告
-                report_file = visualizer.generate_html_report(json_file)
+                # 生成HTML报告（可视化数据已是ECharts格式，无需再次转换）
+                report_file = visualizer.generate_html_report(viz_file)
                 # 自动打开报告
                 webbrowser.open(f'file://{Path(report_file).absolute()}')
                 logger.info(f"Call graph report generated: {report_file}")